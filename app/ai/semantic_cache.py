@@ -0,0 +1,65 @@
+import re
+from typing import Optional, Tuple
+from cachetools import TTLCache
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that don't change what a question is asking about
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "me", "my", "i", "you", "it", "is", "are", "was", "were",
+    "be", "to", "of", "in", "on", "for", "and", "or", "please", "can", "could",
+    "would", "do", "does", "did", "there", "any", "some", "this", "that", "these",
+    "those", "about", "tell", "show", "give", "list", "what", "which"
+})
+
+
+def _terms(text: str) -> frozenset:
+    """Reduce a question to its content words, folding simple plurals."""
+    terms = set()
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(word)
+    return frozenset(terms)
+
+
+class SemanticCache:
+    """Cache answers to questions that are worded differently but ask the same thing.
+
+    Questions are compared by the Jaccard similarity of their content words,
+    and only within the same session, so an answer is never reused across
+    different searches.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_sessions: int = 1024,
+                 max_entries: int = 32, ttl: int = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._sessions = TTLCache(maxsize=max_sessions, ttl=ttl)
+
+    def get(self, text: str, session_id: str) -> Tuple[Optional[str], float]:
+        """Return the best cached answer for the session and its similarity, or (None, best similarity)."""
+        terms = _terms(text)
+        # A question made only of stop words says nothing about what it asks
+        if not terms:
+            return None, 0.0
+        best_response, best_similarity = None, 0.0
+        for cached_terms, response in self._sessions.get(session_id, ()):
+            similarity = len(terms & cached_terms) / len(terms | cached_terms)
+            if similarity > best_similarity:
+                best_response, best_similarity = response, similarity
+        if best_similarity >= self.threshold:
+            return best_response, best_similarity
+        return None, best_similarity
+
+    def set(self, text: str, response: str, session_id: str) -> None:
+        """Store an answer for a question within a session."""
+        terms = _terms(text)
+        if not terms:
+            return
+        entries = self._sessions.get(session_id, [])
+        entries.append((terms, response))
+        # Reassign so the session's TTL restarts on every new answer
+        self._sessions[session_id] = entries[-self.max_entries:]
@@ -1,26 +1,29 @@
 from fastapi import FastAPI, Request, Form
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi_mcp import FastApiMCP
+import asyncio
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 from app.logsearch.s3_operations import S3Operations
 from app.logsearch.log_processor import LogProcessor
-from typing import List, Optional
+from app.logsearch.log_processor_index import LogIndex
+from app.utils.logging_config import setup_logging
+from typing import Dict, List, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pydantic import BaseModel
 
-# Configure logging with more detailed format
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG for more detailed logs
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
+# Load environment variables, then apply LOG_LEVEL; importing S3Operations
+# already configured logging, so a basicConfig call here would be a no-op
 load_dotenv()
+setup_logging()
 
 # Check required environment variables
 required_env_vars = ['AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'BUCKET_NAME']
@@ -33,7 +36,8 @@ if missing_vars:
 app = FastAPI(
     title="LokiLens",
     description="Log Search and Analysis Tool",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Mount static files
@@ -51,6 +55,12 @@ s3_ops = S3Operations(
 # Initialize log processor
 log_processor = LogProcessor()
 
+# Trigram index used to skip shards that cannot contain the search id
+log_index = LogIndex(s3_ops)
+
+# Number of log files downloaded and scanned in parallel per time range
+MAX_FILE_WORKERS = 16
+
 # Pydantic models for request/response
 class SearchRequest(BaseModel):
     search_id: str
@@ -74,25 +84,58 @@ mcp = FastApiMCP(
     description="Model Context Protocol interface for LokiLens log search"
 )
 
+TIMESTAMP_FORMATS = [
+    "%Y%m%d%H%M",  # YYYYMMDDHHMM (for S3 bucket filenames)
+    "%Y%m%d%H%M_%S",  # YYYYMMDDHHMM_SS (for S3 bucket filenames with seconds)
+    "%Y-%m-%dT%H:%M:%S%z",  # ISO format with timezone
+    "%Y-%m-%dT%H:%M:%S",  # ISO format without timezone
+    "%Y-%m-%d %H:%M:%S"  # Standard format
+]
+
+def _timestamp_format(timestamp_str: str) -> Optional[str]:
+    """Pick the one format that fits the shape of the timestamp, or None if unsure."""
+    length = len(timestamp_str)
+    if length == 12 and timestamp_str.isdigit():
+        return "%Y%m%d%H%M"
+    if length == 15 and timestamp_str[12] == "_":
+        return "%Y%m%d%H%M_%S"
+    if length >= 19 and timestamp_str[10] == "T":
+        return "%Y-%m-%dT%H:%M:%S" if length == 19 else "%Y-%m-%dT%H:%M:%S%z"
+    if length == 19 and timestamp_str[10] == " ":
+        return "%Y-%m-%d %H:%M:%S"
+    return None
+
+@lru_cache(maxsize=4096)
 def parse_timestamp(timestamp_str: str) -> datetime:
     """Parse timestamp in various formats to datetime object."""
-    logger.debug(f"Attempting to parse timestamp: {timestamp_str}")
+    logger.debug("Attempting to parse timestamp: %s", timestamp_str)
     
-    formats = [
-        "%Y%m%d%H%M",  # YYYYMMDDHHMM (for S3 bucket filenames)
-        "%Y%m%d%H%M_%S",  # YYYYMMDDHHMM_SS (for S3 bucket filenames with seconds)
-        "%Y-%m-%dT%H:%M:%S%z",  # ISO format with timezone
-        "%Y-%m-%dT%H:%M:%S",  # ISO format without timezone
-        "%Y-%m-%d %H:%M:%S"  # Standard format
-    ]
+    # S3 filename timestamps (YYYYMMDDHHMM) dominate; build them without strptime
+    if len(timestamp_str) == 12 and timestamp_str.isdigit():
+        try:
+            return datetime(
+                int(timestamp_str[0:4]), int(timestamp_str[4:6]), int(timestamp_str[6:8]),
+                int(timestamp_str[8:10]), int(timestamp_str[10:12])
+            )
+        except ValueError:
+            pass
+    
+    # Try the format matching the timestamp's shape first so the common
+    # case costs one strptime call instead of a cascade of ValueErrors
+    fmt = _timestamp_format(timestamp_str)
+    if fmt:
+        try:
+            return datetime.strptime(timestamp_str, fmt)
+        except ValueError:
+            pass
     
-    for fmt in formats:
+    for fmt in TIMESTAMP_FORMATS:
         try:
             parsed = datetime.strptime(timestamp_str, fmt)
-            logger.debug(f"Successfully parsed timestamp with format {fmt}: {parsed}")
+            logger.debug("Successfully parsed timestamp with format %s: %s", fmt, parsed)
             return parsed
         except ValueError as e:
-            logger.debug(f"Failed to parse with format {fmt}: {str(e)}")
+            logger.debug("Failed to parse with format %s: %s", fmt, e)
             continue
     
     raise ValueError(f"Invalid timestamp format: {timestamp_str}")
@@ -138,18 +181,85 @@ async def search_logs_api(request: SearchRequest):
     """Search logs for the given ID across multiple time ranges and return JSON results."""
     try:
         logger.info(f"Received API request: search_id={request.search_id}, time_ranges={request.time_ranges}")
-        results = await search_logs(request.search_id, request.time_ranges)
-        return JSONResponse(content=results)
+        # Returning the response directly skips re-validating every LogEntry
+        # against response_model; the schema still documents the shape
+        return ORJSONResponse(content=await search_logs(request.search_id, request.time_ranges))
     except Exception as e:
         logger.error(f"Error searching logs: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e)}
         )
 
+def _process_one(bucket_name: str, file: str, search_id: str) -> dict:
+    """Stream a single log file from S3 and return its matches grouped by container."""
+    logger.info(f"Processing file: {file}")
+    body = s3_ops.open_object_stream(bucket_name, file)
+    try:
+        return log_processor.process_gzipped_stream(body, search_id)
+    finally:
+        body.close()
+
+def _search_time_range(search_id: str, bucket_name: str, timestamp_str: str) -> Dict[str, List[str]]:
+    """Search every log file for one time range. Blocking; run it off the event loop."""
+    try:
+        # Parse the timestamp
+        search_time = parse_timestamp(timestamp_str)
+        logger.info(f"Searching for timestamp: {search_time}")
+        
+        # Format the timestamp for S3 filename search
+        s3_prefix = search_time.strftime('%Y%m%d%H%M')
+        logger.info(f"Searching for S3 files with prefix: {s3_prefix}")
+        
+        # Search for logs, grouped by container name
+        results = defaultdict(list)
+        
+        try:
+            # List all files in the bucket
+            files = s3_ops.list_files_for_date(bucket_name, s3_prefix)
+            logger.info(f"Found {len(files) if files else 0} files with prefix {s3_prefix}")
+            
+            if files:
+                files = log_index.candidate_files(bucket_name, s3_prefix, files, search_id)
+            
+            if files:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Files found: %s", files)
+                
+                # Download and scan files concurrently; S3 reads and inflate both release the GIL
+                with ThreadPoolExecutor(max_workers=MAX_FILE_WORKERS) as executor:
+                    futures = {
+                        executor.submit(_process_one, bucket_name, file, search_id): file
+                        for file in files
+                    }
+                    for future in as_completed(futures):
+                        file = futures[future]
+                        try:
+                            matches = future.result()
+                        except Exception as e:
+                            logger.error(f"Error processing file {file}: {str(e)}")
+                            continue
+                        if matches:
+                            logger.info(f"Found matches in file {file}")
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Matches: %s", matches)
+                            for container_name, logs in matches.items():
+                                results[container_name].extend(logs)
+            
+            if results:
+                logger.info(f"Added {sum(len(logs) for logs in results.values())} results for timestamp {timestamp_str}")
+        
+        except Exception as e:
+            logger.error(f"Error listing files for prefix {s3_prefix}: {str(e)}")
+        
+        return results
+    
+    except ValueError as e:
+        logger.warning(f"Invalid timestamp format: {timestamp_str}")
+        return {}
+
 async def search_logs(search_id: str, time_ranges: list) -> dict:
     """Common search function used by both HTML and API endpoints."""
-    all_results = []
     bucket_name = os.getenv('BUCKET_NAME')
     
     if not bucket_name:
@@ -159,77 +269,33 @@ async def search_logs(search_id: str, time_ranges: list) -> dict:
     logger.info(f"Time ranges: {time_ranges}")
     logger.info(f"Using bucket: {bucket_name}")
     
-    for timestamp_str in time_ranges:
-        try:
-            # Parse the timestamp
-            search_time = parse_timestamp(timestamp_str)
-            logger.info(f"Searching for timestamp: {search_time}")
-            
-            # Format the timestamp for S3 filename search
-            s3_prefix = search_time.strftime('%Y%m%d%H%M')
-            logger.info(f"Searching for S3 files with prefix: {s3_prefix}")
-            
-            # Search for logs
-            results = []
-            
-            try:
-                # List all files in the bucket
-                files = s3_ops.list_files_for_date(bucket_name, s3_prefix)
-                logger.info(f"Found {len(files) if files else 0} files with prefix {s3_prefix}")
-                
-                if files:
-                    logger.debug(f"Files found: {files}")
-                    
-                    for file in files:
-                        try:
-                            logger.info(f"Processing file: {file}")
-                            content = s3_ops.get_file_content(bucket_name, file)
-                            logger.debug(f"File content length: {len(content) if content else 0}")
-                            
-                            matches = log_processor.process_gzipped_logs(content, search_id)
-                            if matches:
-                                logger.info(f"Found matches in file {file}")
-                                logger.debug(f"Matches: {matches}")
-                                # Convert matches to the expected format
-                                for container_name, logs in matches.items():
-                                    for log in logs:
-                                        results.append({
-                                            'container_name': container_name,
-                                            'message': log,
-                                            'timestamp': timestamp_str
-                                        })
-                        except Exception as e:
-                            logger.error(f"Error processing file {file}: {str(e)}")
-                
-                if results:
-                    all_results.extend(results)
-                    logger.info(f"Added {len(results)} results for timestamp {timestamp_str}")
-            
-            except Exception as e:
-                logger.error(f"Error listing files for prefix {s3_prefix}: {str(e)}")
-                continue
-        
-        except ValueError as e:
-            logger.warning(f"Invalid timestamp format: {timestamp_str}")
-            continue
+    # boto3 is blocking, so each time range runs in a worker thread and the
+    # event loop stays free to serve other requests
+    range_results = await asyncio.gather(*(
+        asyncio.to_thread(_search_time_range, search_id, bucket_name, timestamp_str)
+        for timestamp_str in time_ranges
+    ))
     
-    # Group results by container name
-    grouped_results = {}
-    for result in all_results:
-        container_name = result.get('container_name', 'unknown')
-        if container_name not in grouped_results:
-            grouped_results[container_name] = []
-        grouped_results[container_name].append(result)
+    # Matches are already grouped by container; build the LogEntry dicts in one pass
+    grouped_results = defaultdict(list)
+    total_results = 0
+    for timestamp_str, matches in zip(time_ranges, range_results):
+        for container_name, logs in matches.items():
+            grouped_results[container_name].extend(
+                {'container_name': container_name, 'message': log, 'timestamp': timestamp_str}
+                for log in logs
+            )
+            total_results += len(logs)
     
-    logger.info(f"Total results found: {len(all_results)}")
-    if all_results:
-        logger.debug(f"Results: {grouped_results}")
+    logger.info(f"Total results found: {total_results}")
+    if total_results and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Results: %s", grouped_results)
     
     return {
         "search_id": search_id,
         "time_ranges": time_ranges,
-        "results": grouped_results,
-        "total_results": len(all_results)
+        "results": dict(grouped_results),
+        "total_results": total_results
     }
 
 # Mount the MCP server
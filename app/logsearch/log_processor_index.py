@@ -0,0 +1,203 @@
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+from typing import BinaryIO, Dict, List, Optional
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from app.logsearch.log_processor import gzip_mod
+from app.logsearch.s3_operations import S3Operations
+
+logger = logging.getLogger(__name__)
+
+# Sidecar index objects live under this prefix, one per time prefix
+INDEX_PREFIX = "index/"
+
+# Loaded indexes, and prefixes known to have none, are reused like listings
+# so a search doesn't fetch (or 404 on) the index object every time. The
+# cache is budgeted by the bytes of trigram blobs held; a missing index counts as 1.
+INDEX_CACHE_BYTES = 256 * 1024 * 1024
+_NO_INDEX = object()
+
+
+def _index_size(index) -> int:
+    """Cache weight of a loaded index: the total size of its trigram blobs."""
+    return 1 if index is _NO_INDEX else max(1, sum(map(len, index.values())))
+
+
+_index_cache = TTLCache(maxsize=INDEX_CACHE_BYTES, ttl=300, getsizeof=_index_size)
+_index_cache_lock = threading.Lock()
+
+# Decompressed bytes read per step while collecting trigrams
+INDEX_CHUNK_SIZE = 1024 * 1024
+
+
+def index_key(date_prefix: str) -> str:
+    """Return the S3 key of the index covering a time prefix."""
+    return f"{INDEX_PREFIX}{date_prefix}.idx"
+
+
+def search_trigrams(search_term: str) -> List[bytes]:
+    """Return the distinct byte trigrams of a search term."""
+    data = search_term.encode("utf-8", errors="replace")
+    return sorted({data[i:i + 3] for i in range(len(data) - 2)})
+
+
+def shard_trigrams(stream: BinaryIO) -> bytes:
+    """
+    Collect the distinct trigrams of a gzipped log shard.
+
+    Args:
+        stream: Readable binary file-like object with gzipped log content
+
+    Returns:
+        Sorted trigrams concatenated into one bytes object, 3 bytes per entry
+    """
+    trigrams = set()
+    tail = b""
+    with gzip_mod.GzipFile(fileobj=stream, mode="rb") as gz_file:
+        while True:
+            chunk = gz_file.read(INDEX_CHUNK_SIZE)
+            if not chunk:
+                break
+            # Carry the last two bytes over so trigrams spanning reads are kept
+            data = tail + chunk
+            trigrams.update(zip(data, data[1:], data[2:]))
+            tail = data[-2:]
+    return b"".join(sorted(bytes(trigram) for trigram in trigrams))
+
+
+def _contains_trigram(trigrams: bytes, trigram: bytes) -> bool:
+    """Binary search a sorted, concatenated trigram blob."""
+    low, high = 0, len(trigrams) // 3
+    while low < high:
+        mid = (low + high) // 2
+        entry = trigrams[mid * 3:mid * 3 + 3]
+        if entry < trigram:
+            low = mid + 1
+        elif entry > trigram:
+            high = mid
+        else:
+            return True
+    return False
+
+
+class LogIndex:
+    def __init__(self, s3_ops: S3Operations):
+        """Initialize the index with the S3 operations used to read and write it."""
+        self.s3_ops = s3_ops
+
+    def build(self, bucket: str, date_prefix: str) -> int:
+        """
+        Build and upload the trigram index for every shard under a time prefix.
+
+        Args:
+            bucket: S3 bucket name
+            date_prefix: Time prefix (YYYYMMDDHHMM) whose shards are indexed
+
+        Returns:
+            Number of shards indexed
+        """
+        shards = {}
+        for file_key in self.s3_ops.list_files_for_date(bucket, date_prefix):
+            body = self.s3_ops.open_object_stream(bucket, file_key)
+            try:
+                shards[file_key] = base64.b64encode(shard_trigrams(body)).decode("ascii")
+            except Exception as e:
+                logger.error(f"Error indexing file {file_key}: {e}")
+            finally:
+                body.close()
+
+        content = gzip_mod.compress(json.dumps({"shards": shards}).encode("utf-8"))
+        self.s3_ops.put_file_content(bucket, index_key(date_prefix), content)
+        with _index_cache_lock:
+            _index_cache.pop((bucket, date_prefix), None)
+        return len(shards)
+
+    def load(self, bucket: str, date_prefix: str) -> Optional[Dict[str, bytes]]:
+        """
+        Load the trigram index for a time prefix.
+
+        Args:
+            bucket: S3 bucket name
+            date_prefix: Time prefix (YYYYMMDDHHMM) of the index
+
+        Returns:
+            Mapping of shard key to its trigram blob, or None if no index exists
+        """
+        with _index_cache_lock:
+            cached = _index_cache.get((bucket, date_prefix))
+        if cached is not None:
+            return None if cached is _NO_INDEX else cached
+        
+        content = self.s3_ops.find_file_content(bucket, index_key(date_prefix))
+        if content is None:
+            index = None
+        else:
+            shards = json.loads(gzip_mod.decompress(content))["shards"]
+            index = {file_key: base64.b64decode(blob) for file_key, blob in shards.items()}
+        
+        entry = _NO_INDEX if index is None else index
+        if _index_size(entry) <= INDEX_CACHE_BYTES:
+            with _index_cache_lock:
+                _index_cache[(bucket, date_prefix)] = entry
+        return index
+
+    def candidate_files(self, bucket: str, date_prefix: str, files: List[str], search_term: str) -> List[str]:
+        """
+        Drop files that the index proves cannot contain the search term.
+
+        Files missing from the index (added after it was built) are always kept,
+        as are all files when there is no index or the term is under 3 bytes.
+
+        Args:
+            bucket: S3 bucket name
+            date_prefix: Time prefix (YYYYMMDDHHMM) the files were listed for
+            files: Keys of the candidate files
+            search_term: Term that will be searched for
+
+        Returns:
+            Keys of the files that still need to be scanned
+        """
+        trigrams = search_trigrams(search_term)
+        if not trigrams:
+            return files
+
+        try:
+            shards = self.load(bucket, date_prefix)
+        except Exception as e:
+            logger.warning(f"Could not load index for prefix {date_prefix}: {e}")
+            return files
+        if not shards:
+            return files
+
+        candidates = [
+            file_key for file_key in files
+            if file_key not in shards
+            or all(_contains_trigram(shards[file_key], trigram) for trigram in trigrams)
+        ]
+        logger.info(f"Index ruled out {len(files) - len(candidates)} of {len(files)} files for prefix {date_prefix}")
+        return candidates
+
+
+def main():
+    """Build indexes for the time prefixes given on the command line."""
+    load_dotenv()
+    bucket_name = os.getenv('BUCKET_NAME')
+    if not bucket_name or len(sys.argv) < 2:
+        print("Usage: BUCKET_NAME=<bucket> python -m app.logsearch.log_processor_index YYYYMMDDHHMM [...]")
+        sys.exit(1)
+
+    log_index = LogIndex(S3Operations(
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+    ))
+    for date_prefix in sys.argv[1:]:
+        count = log_index.build(bucket_name, date_prefix)
+        logger.info(f"Indexed {count} files for prefix {date_prefix}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,75 @@
 import logging
-from collections import defaultdict
+import os
+from typing import Dict, Iterable, Iterator, List, Set
+from concurrent.futures import ThreadPoolExecutor
 from app.logsearch.s3_operations import S3Operations
 from app.logsearch.log_processor import LogProcessor
+from app.logsearch.log_processor_index import INDEX_PREFIX
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by setup_logging (LOG_LEVEL), run when S3Operations is imported
 logger = logging.getLogger(__name__)
 
+# Prefixes tried in order until one has matches; put the likeliest first.
+# Override with a comma-separated LOG_SEARCH_PREFIXES, e.g. "logs,"
+SEARCH_PREFIXES = os.getenv(
+    'LOG_SEARCH_PREFIXES', 'kubernetes.var.log.containers,logs,'
+).split(',')
+
+# Files scanned at once; past ~16 threads S3 throughput tends to regress
+MAX_FILE_WORKERS = 16
+
+def _process_file(s3_ops: S3Operations, bucket_name: str, log_file: str, search_id: str) -> dict:
+    """Stream one log file and return its matches grouped by container, or nothing on error."""
+    # Runs once per file; skip the formatting unless debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"📜 Processing file: {log_file}")
+    try:
+        body = s3_ops.open_object_stream(bucket_name, log_file)
+        try:
+            return LogProcessor.process_gzipped_stream(body, search_id)
+        finally:
+            body.close()
+    except Exception as e:
+        logger.error(f"Error processing file {log_file}: {e}")
+        return {}
+
+def _unscanned_log_files(keys: Iterable[str], scanned: Set[str]) -> Iterator[str]:
+    """Yield the log files not scanned yet, marking them as scanned."""
+    for key in keys:
+        # Index sidecars are not log shards, and the broader prefixes list the
+        # files of the narrower ones again; don't scan those twice
+        if key.startswith(INDEX_PREFIX) or key in scanned:
+            continue
+        scanned.add(key)
+        yield key
+
+def _search_files(s3_ops: S3Operations, bucket_name: str, files: Iterable[str], search_id: str) -> Dict[str, List[str]]:
+    """Scan files concurrently and merge their matches in listing order."""
+    grouped_logs: Dict[str, List[str]] = {}
+    # Downloads overlap each other and decompression releases the GIL,
+    # so files are scanned concurrently and merged here in listing order
+    with ThreadPoolExecutor(max_workers=MAX_FILE_WORKERS) as executor:
+        for grouped_matches in executor.map(
+            lambda log_file: _process_file(s3_ops, bucket_name, log_file, search_id), files
+        ):
+            # One lookup per container per file; setdefault creates the list on first sight
+            for container, logs in grouped_matches.items():
+                grouped_logs.setdefault(container, []).extend(logs)
+    return grouped_logs
+
 def search_logs(search_id: str, bucket_name: str, s3_ops: S3Operations) -> dict:
     """Search logs for a given ID and return grouped results."""
-    prefixes = [
-        "kubernetes.var.log.containers",
-        "logs",
-        ""  # root level
-    ]
-    
-    final_grouped_logs = defaultdict(list)
+    scanned = set()
     
-    for prefix in prefixes:
+    for prefix in SEARCH_PREFIXES:
         logger.info(f"\n🔍 Searching with prefix: {prefix}")
-        files = s3_ops.list_bucket_contents(bucket_name, prefix)
-        
-        if files:
-            logger.info(f"Found {len(files)} files with prefix {prefix}")
-            for log_file in files:
-                logger.info(f"📜 Processing file: {log_file}")
-                try:
-                    file_content = s3_ops.get_file_content(bucket_name, log_file)
-                    grouped_matches = LogProcessor.process_gzipped_logs(file_content, search_id)
-                    
-                    for container, logs in grouped_matches.items():
-                        final_grouped_logs[container].extend(logs)
-                        
-                except Exception as e:
-                    logger.error(f"Error processing file {log_file}: {e}")
-
-            if final_grouped_logs:
-                break  # Stop searching if we found matches
+        # Files are handed to the workers as each listing page arrives, so
+        # scanning starts before the whole prefix has been listed
+        already_scanned = len(scanned)
+        files = _unscanned_log_files(s3_ops.iter_bucket_contents(bucket_name, prefix), scanned)
+        grouped_logs = _search_files(s3_ops, bucket_name, files, search_id)
+        logger.info(f"Scanned {len(scanned) - already_scanned} files with prefix {prefix}")
+        if grouped_logs:
+            return grouped_logs  # Stop searching once a prefix has matches
     
-    return final_grouped_logs 
\ No newline at end of file
+    return {}
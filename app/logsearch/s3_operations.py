@@ -1,6 +1,13 @@
 import boto3
+import io
 import logging
-from typing import List
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import BinaryIO, Iterator, List, Optional
+from cachetools import TTLCache
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from app.utils.logging_config import setup_logging
 
@@ -8,6 +15,34 @@ from app.utils.logging_config import setup_logging
 loggers = setup_logging()
 logger = loggers['s3']
 
+# Upper bound on concurrent HTTP connections held by the S3 client. A search
+# over several time ranges runs up to 16 file workers per range at once
+# (MAX_FILE_WORKERS in app.py), so this leaves room for about three ranges
+MAX_POOL_CONNECTIONS = 50
+
+# Listing threads per call; more than this tends to slow S3 down rather than help
+MAX_LIST_WORKERS = 16
+
+# Repeat searches over the same window reuse listings and small shards.
+# Shards are written once, so object bodies are keyed by bucket and key.
+MAX_CACHED_OBJECT_SIZE = 10 * 1024 * 1024
+# Total bytes of object bodies kept in memory per process
+OBJECT_CACHE_BYTES = 256 * 1024 * 1024
+_list_cache = TTLCache(maxsize=1024, ttl=300)
+_object_cache = TTLCache(maxsize=OBJECT_CACHE_BYTES, ttl=900, getsizeof=len)
+_cache_lock = threading.Lock()
+
+# Minutes after which a time prefix is assumed to have all of its shards
+LISTING_SETTLE_MINUTES = 10
+
+def _is_settled(date_prefix: str) -> bool:
+    """Whether a YYYYMMDDHHMM prefix is old enough that no more shards will land under it."""
+    try:
+        prefix_time = datetime.strptime(date_prefix, '%Y%m%d%H%M')
+    except ValueError:
+        return False
+    return datetime.now() - prefix_time > timedelta(minutes=LISTING_SETTLE_MINUTES)
+
 class S3Operations:
     def __init__(self, aws_access_key_id=None, aws_secret_access_key=None):
         """Initialize S3 operations with AWS credentials."""
@@ -16,16 +51,46 @@ class S3Operations:
         self.aws_secret_access_key = aws_secret_access_key
         
         try:
+            # The client is shared across worker threads; size the connection
+            # pool so concurrent GETs don't queue for a connection, and keep
+            # connections alive so they are reused instead of re-handshaking
+            config = Config(
+                max_pool_connections=MAX_POOL_CONNECTIONS,
+                retries={'max_attempts': 5, 'mode': 'adaptive'},
+                tcp_keepalive=True
+            )
             self.s3_client = boto3.client(
                 's3',
                 aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key
+                aws_secret_access_key=self.aws_secret_access_key,
+                config=config
             )
+            # Paginators are reusable; list_objects_v2 caps each response at 1000 keys
+            self._list_paginator = self.s3_client.get_paginator('list_objects_v2')
             logger.info("S3 client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize S3 client: {str(e)}", exc_info=True)
             raise
 
+    def _iter_keys(self, bucket: str, prefix: str = '') -> Iterator[str]:
+        """Yield every key under a prefix, one page at a time, following continuation tokens."""
+        for page in self._list_paginator.paginate(
+            Bucket=bucket, Prefix=prefix, PaginationConfig={'PageSize': 1000}
+        ):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def _list_keys(self, bucket: str, prefix: str = '') -> List[str]:
+        """List every key under a prefix, following continuation tokens."""
+        return list(self._iter_keys(bucket, prefix))
+
+    def _list_one_prefix(self, bucket: str, prefix: str) -> List[str]:
+        """List one candidate prefix of a date, logging when it has files."""
+        files = self._list_keys(bucket, prefix)
+        if files:
+            logger.info(f"Found {len(files)} files with prefix {prefix}")
+        return files
+
     def list_buckets(self):
         """List all S3 buckets."""
         logger.info("Listing S3 buckets")
@@ -42,11 +107,7 @@ class S3Operations:
         """List objects in an S3 bucket with optional prefix."""
         logger.info(f"Listing objects in bucket {bucket_name} with prefix {prefix}")
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=bucket_name,
-                Prefix=prefix
-            )
-            objects = [obj['Key'] for obj in response.get('Contents', [])]
+            objects = self._list_keys(bucket_name, prefix)
             logger.info(f"Found {len(objects)} objects")
             return objects
         except Exception as e:
@@ -81,13 +142,14 @@ class S3Operations:
         """
         try:
             logger.info(f"Listing contents of bucket {bucket} with prefix {prefix}")
-            response = self.s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
+            keys = self._list_keys(bucket, prefix)
             
-            if "Contents" in response:
-                keys = [obj["Key"] for obj in response["Contents"]]
+            if keys:
                 logger.info(f"Found {len(keys)} objects in bucket")
-                for key in keys:
-                    logger.info(f"  - {key}")
+                # Listing every key is O(N) formatting and I/O; only do it when debugging
+                if logger.isEnabledFor(logging.DEBUG):
+                    for key in keys:
+                        logger.debug(f"  - {key}")
                 return keys
             else:
                 logger.info("No objects found in bucket")
@@ -97,6 +159,27 @@ class S3Operations:
             logger.error(f"Error listing bucket contents: {e}")
             return []
 
+    def iter_bucket_contents(self, bucket: str, prefix: str = '') -> Iterator[str]:
+        """
+        Lazily list the contents of the bucket, page by page.
+        
+        Unlike list_bucket_contents, keys are yielded as each page of the
+        listing arrives, so callers can start on the first files while the
+        rest are still being listed, in constant memory.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Optional prefix to filter results
+            
+        Yields:
+            Keys in the bucket under the prefix
+        """
+        logger.info(f"Iterating contents of bucket {bucket} with prefix {prefix}")
+        try:
+            yield from self._iter_keys(bucket, prefix)
+        except ClientError as e:
+            logger.error(f"Error listing bucket contents: {e}")
+
     def list_files_for_date(self, bucket: str, date_prefix: str) -> List[str]:
         """
         List all S3 files matching the given date.
@@ -108,6 +191,13 @@ class S3Operations:
         Returns:
             List of file keys matching the prefix
         """
+        with _cache_lock:
+            cached_files = _list_cache.get((bucket, date_prefix))
+        if cached_files is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Using cached listing for date {date_prefix}")
+            return list(cached_files)
+        
         try:
             # Try different path patterns
             prefixes = [
@@ -116,17 +206,19 @@ class S3Operations:
                 date_prefix  # Try without any prefix
             ]
             
-            all_files = []
-            for prefix in prefixes:
-                logger.debug(f"Trying prefix: {prefix}")
-                response = self.s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
-                
-                if "Contents" in response:
-                    files = [obj["Key"] for obj in response["Contents"]]
-                    logger.info(f"Found {len(files)} files with prefix {prefix}")
-                    all_files.extend(files)
+            # List all prefixes at once so the round-trips overlap
+            with ThreadPoolExecutor(max_workers=min(len(prefixes), MAX_LIST_WORKERS)) as executor:
+                all_files = list(chain.from_iterable(
+                    executor.map(lambda prefix: self._list_one_prefix(bucket, prefix), prefixes)
+                ))
             
-            return all_files
+            # An empty or partial listing may just mean the shards haven't all
+            # landed yet (the speculative search always asks for the current
+            # minute), so only settled minutes are cached
+            if all_files and _is_settled(date_prefix):
+                with _cache_lock:
+                    _list_cache[(bucket, date_prefix)] = all_files
+            return list(all_files)
             
         except ClientError as e:
             logger.error(f"Error listing files for date {date_prefix}: {e}")
@@ -143,9 +235,92 @@ class S3Operations:
         Returns:
             File content as bytes
         """
+        with _cache_lock:
+            content = _object_cache.get((bucket, file_key))
+        if content is not None:
+            return content
+        
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=file_key)
+            content = response["Body"].read()
+        except ClientError as e:
+            logger.error(f"Error getting file {file_key}: {e}")
+            raise
+        
+        self._cache_object(bucket, file_key, content)
+        return content
+
+    def open_object_stream(self, bucket: str, file_key: str) -> BinaryIO:
+        """
+        Open an S3 file for streaming reads.
+        
+        Objects up to MAX_CACHED_OBJECT_SIZE are read in full and served from
+        the object cache on later calls; larger ones are streamed directly.
+        
+        Args:
+            bucket: S3 bucket name
+            file_key: Key of the file to retrieve
+            
+        Returns:
+            Readable binary stream of the object; the caller is responsible for closing it
+        """
+        with _cache_lock:
+            content = _object_cache.get((bucket, file_key))
+        if content is not None:
+            return io.BytesIO(content)
+        
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=file_key)
+            body = response["Body"]
+            if response.get("ContentLength", MAX_CACHED_OBJECT_SIZE + 1) > MAX_CACHED_OBJECT_SIZE:
+                return body
+            with body:
+                content = body.read()
+        except ClientError as e:
+            logger.error(f"Error opening file {file_key}: {e}")
+            raise
+        
+        self._cache_object(bucket, file_key, content)
+        return io.BytesIO(content)
+
+    def _cache_object(self, bucket: str, file_key: str, content: bytes) -> None:
+        """Keep an object body in the object cache if it is small enough."""
+        if len(content) <= MAX_CACHED_OBJECT_SIZE:
+            with _cache_lock:
+                _object_cache[(bucket, file_key)] = content
+
+    def find_file_content(self, bucket: str, file_key: str) -> Optional[bytes]:
+        """
+        Get the content of an S3 file that may not exist.
+        
+        Args:
+            bucket: S3 bucket name
+            file_key: Key of the file to retrieve
+            
+        Returns:
+            File content as bytes, or None if there is no such key
+        """
         try:
             response = self.s3_client.get_object(Bucket=bucket, Key=file_key)
             return response["Body"].read()
         except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
             logger.error(f"Error getting file {file_key}: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    def put_file_content(self, bucket: str, file_key: str, content: bytes) -> None:
+        """
+        Upload content to an S3 file, replacing any existing object.
+        
+        Args:
+            bucket: S3 bucket name
+            file_key: Key of the file to write
+            content: File content as bytes
+        """
+        try:
+            self.s3_client.put_object(Bucket=bucket, Key=file_key, Body=content)
+            logger.info(f"Uploaded {len(content)} bytes to {file_key}")
+        except ClientError as e:
+            logger.error(f"Error uploading file {file_key}: {e}")
+            raise
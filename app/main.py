@@ -6,11 +6,7 @@ import threading
 from app.logsearch.s3_operations import S3Operations
 from app.slack.slack_app import start_slack_app
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by setup_logging (LOG_LEVEL), run when S3Operations is imported
 logger = logging.getLogger(__name__)
 
 def load_config():
@@ -52,10 +48,10 @@ def main():
     
     logger.info("✅ Slack integration started")
     
-    # Keep the main thread running
+    # Keep the main thread alive without spinning; the Slack thread is a daemon
+    stop = threading.Event()
     try:
-        while True:
-            pass
+        stop.wait()
     except KeyboardInterrupt:
         logger.info("Shutting down...")
 
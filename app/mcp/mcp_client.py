@@ -1,15 +1,20 @@
+import asyncio
 import os
-from typing import List, Dict, Any
-import json
-import requests
+from typing import AsyncIterator, List, Dict, Any, Optional
+import orjson
+import httpx
 from dotenv import load_dotenv
 import logging
-from openai import OpenAI
+from openai import AsyncOpenAI
+from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
 import sys
 import urllib.parse
-import sseclient
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
+import threading
+from cachetools import TTLCache
 from app.utils.logging_config import setup_logging
 
 # Setup logging
@@ -19,13 +24,133 @@ logger = loggers['mcp']
 # Load environment variables
 load_dotenv()
 
+# Repeat searches for the same ID and time ranges skip the server round-trip
+_search_cache = TTLCache(maxsize=256, ttl=300)
+_search_cache_lock = threading.Lock()
+
+# Prompt and tool schema are the same for every chat; build them once
+SYSTEM_MESSAGE = """You are a helpful assistant that can search and analyze logs.
+        You have access to a log search tool that can find logs by ID and time ranges.
+        
+        IMPORTANT RULES:
+        1. You MUST have both a search_id AND at least one time_range before using the search_logs tool
+        2. If the user doesn't provide a time range, use 00:00 as the default time
+        3. If the user doesn't provide a search ID, you MUST ask for it
+        4. Time ranges should be in format YYYYMMDDHHMM
+        5. If the user provides a date without time, automatically use 00:00
+        6. If the user provides a month without day, use the first day of the month
+        7. If the user provides a relative date (e.g., "yesterday", "today"), convert it to absolute date
+        8. For follow-up questions, use the context from previous searches when possible
+        9. If a follow-up question requires new information, make a new search request
+        10. Always maintain conversation context and refer to previous information when relevant
+        
+        When users ask questions about logs, you should:
+        1. Extract relevant search IDs and time ranges from their questions
+        2. If search ID is missing, ask for it
+        3. For dates without time, automatically use 00:00
+        4. For months without day, automatically use the first day
+        5. Only use the search_logs tool when you have ALL required parameters
+        6. Analyze the results and provide a natural language response
+        7. For follow-up questions, use previous search results when appropriate
+        8. If a follow-up requires new information, make a new search request
+        """
+
+SEARCH_LOGS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "search_logs",
+        "description": "Search logs by ID and time ranges. REQUIRES both search_id and at least one time_range.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "search_id": {
+                    "type": "string",
+                    "description": "The ID to search for in logs (REQUIRED)"
+                },
+                "time_ranges": {
+                    "type": "array",
+                    "items": {
+                        "type": "string"
+                    },
+                    "description": "List of timestamps to search in format YYYYMMDDHHMM (REQUIRED, at least one)"
+                }
+            },
+            "required": ["search_id", "time_ranges"]
+        }
+    }
+}
+
+# Date patterns are compiled once at import
+_TS12_RE = re.compile(r'^\d{12}$')
+_MONTH_YEAR_RE = re.compile(
+    r'(?:January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})',
+    re.IGNORECASE
+)
+_MONTH_NAME_RE = re.compile(r'[A-Za-z]+')
+
+DATE_FORMATS = [
+    '%Y-%m-%d %H:%M',  # 2025-02-02 23:29
+    '%Y-%m-%d',         # 2025-02-02
+    '%Y/%m/%d %H:%M',   # 2025/02/02 23:29
+    '%Y/%m/%d',         # 2025/02/02
+    '%d-%m-%Y %H:%M',   # 02-02-2025 23:29
+    '%d-%m-%Y',         # 02-02-2025
+    '%d/%m/%Y %H:%M',   # 02/02/2025 23:29
+    '%d/%m/%Y',         # 02/02/2025
+    '%B %d, %Y %H:%M',  # February 2, 2025 23:29
+    '%B %d, %Y',        # February 2, 2025
+    '%b %d, %Y %H:%M',  # Feb 2, 2025 23:29
+    '%b %d, %Y',        # Feb 2, 2025
+]
+
+def _date_format(date_str: str) -> Optional[str]:
+    """Pick the one format that fits the shape of the date string, or None if unsure."""
+    time_part = ' %H:%M' if ':' in date_str else ''
+    if date_str[4:5] in ('-', '/') and date_str[:4].isdigit():
+        sep = date_str[4]
+        return f'%Y{sep}%m{sep}%d{time_part}'
+    if date_str[2:3] in ('-', '/') and date_str[:2].isdigit():
+        sep = date_str[2]
+        return f'%d{sep}%m{sep}%Y{time_part}'
+    if date_str[:1].isalpha() and ',' in date_str:
+        month = date_str.split(' ', 1)[0]
+        return f"{'%b' if len(month) == 3 else '%B'} %d, %Y{time_part}"
+    return None
+
+@lru_cache(maxsize=512)
+def _parse_absolute_date(date_str: str) -> datetime:
+    """Parse a calendar date string; the result doesn't depend on today, so it is memoized."""
+    # Try the format matching the string's shape first so the common case
+    # costs one strptime call instead of a cascade of ValueErrors
+    fmt = _date_format(date_str)
+    if fmt:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            pass
+    
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    
+    # Handle month names without day
+    match = _MONTH_YEAR_RE.search(date_str)
+    if match:
+        year = int(match.group(1))
+        month_name = _MONTH_NAME_RE.search(date_str).group()
+        return datetime.strptime(f"{month_name} 1, {year}", "%B %d, %Y")
+    raise ValueError("Unrecognized date format")
+
 class LogSearchClient:
     def __init__(
         self,
         mcp_server_url: str = "http://localhost:8000/mcp",
         openai_api_key: str = None,
         default_model: str = "gpt-4-turbo-preview",
-        timeout: int = 5
+        timeout: int = 5,
+        http_client: httpx.AsyncClient = None
     ):
         logger.info("Initializing LogSearchClient...")
         # Ensure the URL is properly formatted
@@ -38,26 +163,46 @@ class LogSearchClient:
         self.conversation_history = []
         self.last_search_results = None
         
+        # One pooled async client for the MCP server and OpenAI, so repeat
+        # searches reuse an open connection and never block the event loop.
+        # Callers may pass a client they already own to share its pool.
+        self._owns_http = http_client is None
+        # Limits go on the transport: httpx ignores the client's limits
+        # when a transport is supplied
+        self.http = http_client or httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+        )
+        
         if not self.openai_api_key:
             logger.error("OpenAI API key not provided")
             raise ValueError("OpenAI API key is required")
         
         logger.info("Initializing OpenAI client...")
         try:
-            self.client = OpenAI(api_key=self.openai_api_key)
+            self.client = AsyncOpenAI(api_key=self.openai_api_key, http_client=self.http)
             logger.info("OpenAI client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             raise
-        
+    
+    async def connect(self):
+        """Perform the MCP handshake; awaited once before chatting."""
         logger.info("Initializing MCP tools...")
         try:
-            self._init_mcp_tools()
+            await self._init_mcp_tools()
             logger.info("MCP tools initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize MCP tools: {str(e)}")
             raise
     
+    async def aclose(self):
+        """Close the HTTP client if this instance created it."""
+        if self._owns_http:
+            await self.http.aclose()
+    
     def _is_follow_up_question(self, query: str) -> bool:
         """Determine if the query is a follow-up question."""
         follow_up_indicators = [
@@ -86,7 +231,7 @@ class LogSearchClient:
         """Parse various date formats and convert to YYYYMMDDHHMM format."""
         try:
             # First check if it's already in YYYYMMDDHHMM format
-            if re.match(r'^\d{12}$', date_str):
+            if _TS12_RE.match(date_str):
                 # Validate the date components
                 try:
                     year = int(date_str[0:4])
@@ -109,46 +254,13 @@ class LogSearchClient:
                 except ValueError as e:
                     raise ValueError(f"Invalid timestamp format: {str(e)}")
             
-            # Handle relative dates
+            # Handle relative dates; these depend on the clock, so they stay out of the cache
             if date_str.lower() in ['today', 'now']:
                 dt = datetime.now()
             elif date_str.lower() == 'yesterday':
                 dt = datetime.now() - timedelta(days=1)
             else:
-                # Try to parse the date string
-                formats = [
-                    '%Y-%m-%d %H:%M',  # 2025-02-02 23:29
-                    '%Y-%m-%d',         # 2025-02-02
-                    '%Y/%m/%d %H:%M',   # 2025/02/02 23:29
-                    '%Y/%m/%d',         # 2025/02/02
-                    '%d-%m-%Y %H:%M',   # 02-02-2025 23:29
-                    '%d-%m-%Y',         # 02-02-2025
-                    '%d/%m/%Y %H:%M',   # 02/02/2025 23:29
-                    '%d/%m/%Y',         # 02/02/2025
-                    '%B %d, %Y %H:%M',  # February 2, 2025 23:29
-                    '%B %d, %Y',        # February 2, 2025
-                    '%b %d, %Y %H:%M',  # Feb 2, 2025 23:29
-                    '%b %d, %Y',        # Feb 2, 2025
-                ]
-                
-                dt = None
-                for fmt in formats:
-                    try:
-                        dt = datetime.strptime(date_str, fmt)
-                        break
-                    except ValueError:
-                        continue
-                
-                if dt is None:
-                    # Handle month names without day
-                    month_pattern = r'(?:January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})'
-                    match = re.search(month_pattern, date_str, re.IGNORECASE)
-                    if match:
-                        year = int(match.group(1))
-                        month_name = re.search(r'[A-Za-z]+', date_str).group()
-                        dt = datetime.strptime(f"{month_name} 1, {year}", "%B %d, %Y")
-                    else:
-                        raise ValueError("Unrecognized date format")
+                dt = _parse_absolute_date(date_str)
             
             # If no time is specified, use 00:00
             if dt.hour == 0 and dt.minute == 0:
@@ -159,7 +271,7 @@ class LogSearchClient:
             logger.error(f"Failed to parse date: {str(e)}")
             raise ValueError(f"Could not parse date: {date_str}. Please provide a valid date and time.")
     
-    def _init_mcp_tools(self):
+    async def _init_mcp_tools(self):
         """Initialize MCP tools from the server."""
         try:
             logger.info(f"Connecting to MCP server at {self.mcp_server_url}")
@@ -170,53 +282,38 @@ class LogSearchClient:
                 'Connection': 'keep-alive'
             }
             
-            response = requests.get(
+            async with self.http.stream(
+                "GET",
                 self.mcp_server_url,
                 headers=headers,
-                timeout=self.timeout,
-                stream=True
-            )
-            
-            logger.info(f"Response status code: {response.status_code}")
-            logger.info(f"Response headers: {response.headers}")
-            response.raise_for_status()
+                timeout=self.timeout
+            ) as response:
+                logger.info(f"Response status code: {response.status_code}")
+                logger.info(f"Response headers: {response.headers}")
+                response.raise_for_status()
+                
+                # Only the endpoint event is needed; read the SSE lines until it
+                # arrives and leave the block, which closes the stream
+                session_id = None
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith('event:'):
+                        event = line[6:].strip()
+                    elif line.startswith('data:') and event == 'endpoint':
+                        # Extract the session ID from the endpoint
+                        session_id = line[5:].strip().split('=')[-1]
+                        break
+                    elif not line:
+                        event = None
             
-            # Parse SSE response
-            client = sseclient.SSEClient(response)
-            for event in client.events():
-                if event.event == 'endpoint':
-                    # Extract the session ID from the endpoint
-                    session_id = event.data.split('=')[-1]
-                    logger.info(f"Received session ID: {session_id}")
-                    # Initialize tools with the session ID
-                    self.tools = {
-                        "search_logs": {
-                            "name": "search_logs",
-                            "description": "Search logs by ID and time ranges. REQUIRES both search_id and at least one time_range.",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {
-                                    "search_id": {
-                                        "type": "string",
-                                        "description": "The ID to search for in logs (REQUIRED)"
-                                    },
-                                    "time_ranges": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": "string"
-                                        },
-                                        "description": "List of timestamps to search in format YYYYMMDDHHMM (REQUIRED, at least one)"
-                                    }
-                                },
-                                "required": ["search_id", "time_ranges"]
-                            }
-                        }
-                    }
-                    break
-            else:
+            if session_id is None:
                 raise ValueError("No endpoint event received from server")
+            
+            logger.info(f"Received session ID: {session_id}")
+            # Initialize tools with the session ID
+            self.tools = {"search_logs": SEARCH_LOGS_TOOL["function"]}
                 
-        except requests.exceptions.ConnectionError as e:
+        except httpx.ConnectError as e:
             error_msg = f"Could not connect to MCP server at {self.mcp_server_url}. Is the server running?"
             logger.error(error_msg)
             logger.error(f"Connection error details: {str(e)}")
@@ -224,7 +321,7 @@ class LogSearchClient:
             print("Please make sure the FastAPI server is running with:")
             print("uvicorn app:app --reload")
             sys.exit(1)
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             error_msg = f"Connection to MCP server timed out after {self.timeout} seconds"
             logger.error(error_msg)
             print(f"\nError: {error_msg}")
@@ -234,7 +331,7 @@ class LogSearchClient:
             logger.error(f"Failed to initialize MCP tools: {str(e)}")
             raise
     
-    def search_logs(self, search_id: str, time_ranges: List[str]) -> Dict[str, Any]:
+    async def search_logs(self, search_id: str, time_ranges: List[str]) -> Dict[str, Any]:
         """Search logs using the MCP tool."""
         logger.info(f"Searching logs for ID: {search_id} with time ranges: {time_ranges}")
         
@@ -244,6 +341,13 @@ class LogSearchClient:
         if not time_ranges or len(time_ranges) == 0:
             raise ValueError("At least one time_range is required")
         
+        cache_key = (search_id, tuple(time_ranges))
+        with _search_cache_lock:
+            cached = _search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached search results for ID: {search_id}")
+            return cached
+        
         try:
             headers = {
                 'Accept': 'application/json',
@@ -251,7 +355,7 @@ class LogSearchClient:
             }
             # Use the correct endpoint URL without /mcp prefix
             base_url = self.mcp_server_url.replace('/mcp', '')
-            response = requests.post(
+            response = await self.http.post(
                 f"{base_url}/api/search",
                 json={
                     "search_id": search_id,
@@ -264,25 +368,33 @@ class LogSearchClient:
             
             # Try to parse the response as JSON
             try:
-                result = response.json()
-                if isinstance(result, dict):
-                    return result
-                else:
+                result = orjson.loads(response.content)
+                if not isinstance(result, dict):
                     # If it's not a dictionary, wrap it in one
-                    return {"results": result}
-            except json.JSONDecodeError:
+                    result = {"results": result}
+            except orjson.JSONDecodeError:
                 # If it's not valid JSON, treat it as a string
-                return {"results": response.text}
+                result = {"results": response.text}
+            
+            # No results may just mean the shards haven't landed yet; ask again next time
+            if result.get("results"):
+                with _search_cache_lock:
+                    _search_cache[cache_key] = result
+            return result
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to search logs: {str(e)}")
             return {"error": str(e), "results": None}
         except Exception as e:
             logger.error(f"Unexpected error while searching logs: {str(e)}")
             return {"error": str(e), "results": None}
     
-    def chat_with_logs(self, query: str, model: str = None) -> str:
+    async def chat_with_logs(self, query: str, model: str = None) -> str:
         """Chat with logs using natural language."""
+        return "".join([part async for part in self.chat_with_logs_stream(query, model)])
+    
+    async def chat_with_logs_stream(self, query: str, model: str = None) -> AsyncIterator[str]:
+        """Chat with logs using natural language, yielding the answer as it is generated."""
         model = model or self.default_model
         logger.info(f"Processing chat query: {query}")
         
@@ -292,69 +404,16 @@ class LogSearchClient:
         # Check if this is a follow-up question
         is_follow_up = self._is_follow_up_question(query)
         
-        # Prepare the system message with conversation context
-        system_message = """You are a helpful assistant that can search and analyze logs.
-        You have access to a log search tool that can find logs by ID and time ranges.
-        
-        IMPORTANT RULES:
-        1. You MUST have both a search_id AND at least one time_range before using the search_logs tool
-        2. If the user doesn't provide a time range, use 00:00 as the default time
-        3. If the user doesn't provide a search ID, you MUST ask for it
-        4. Time ranges should be in format YYYYMMDDHHMM
-        5. If the user provides a date without time, automatically use 00:00
-        6. If the user provides a month without day, use the first day of the month
-        7. If the user provides a relative date (e.g., "yesterday", "today"), convert it to absolute date
-        8. For follow-up questions, use the context from previous searches when possible
-        9. If a follow-up question requires new information, make a new search request
-        10. Always maintain conversation context and refer to previous information when relevant
-        
-        When users ask questions about logs, you should:
-        1. Extract relevant search IDs and time ranges from their questions
-        2. If search ID is missing, ask for it
-        3. For dates without time, automatically use 00:00
-        4. For months without day, automatically use the first day
-        5. Only use the search_logs tool when you have ALL required parameters
-        6. Analyze the results and provide a natural language response
-        7. For follow-up questions, use previous search results when appropriate
-        8. If a follow-up requires new information, make a new search request
-        """
-        
-        # Prepare the tools description
-        tools = [{
-            "type": "function",
-            "function": {
-                "name": "search_logs",
-                "description": "Search logs by ID and time ranges. REQUIRES both search_id and at least one time_range.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "search_id": {
-                            "type": "string",
-                            "description": "The ID to search for in logs (REQUIRED)"
-                        },
-                        "time_ranges": {
-                            "type": "array",
-                            "items": {
-                                "type": "string"
-                            },
-                            "description": "List of timestamps to search in format YYYYMMDDHHMM (REQUIRED, at least one)"
-                        }
-                    },
-                    "required": ["search_id", "time_ranges"]
-                }
-            }
-        }]
-        
         try:
             logger.info("Sending request to OpenAI...")
             # First call to OpenAI
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=[
-                    {"role": "system", "content": system_message},
+                    {"role": "system", "content": SYSTEM_MESSAGE},
                     *self.conversation_history[-5:],  # Include last 5 messages for context
                 ],
-                tools=tools,
+                tools=[SEARCH_LOGS_TOOL],
                 tool_choice="auto"
             )
             
@@ -366,29 +425,34 @@ class LogSearchClient:
                 tool_call = message.tool_calls[0]
                 if tool_call.function.name == "search_logs":
                     # Extract parameters
-                    args = json.loads(tool_call.function.arguments)
+                    args = orjson.loads(tool_call.function.arguments)
                     logger.info(f"Searching logs with parameters: {args}")
                     
                     # Validate parameters before making the call
                     if not args.get("search_id"):
-                        return "I need a search ID to look up the logs. Could you please provide one?"
+                        yield "I need a search ID to look up the logs. Could you please provide one?"
+                        return
                     if not args.get("time_ranges") or len(args["time_ranges"]) == 0:
-                        return "I need at least one time range to search for the logs. Please provide a timestamp in YYYYMMDDHHMM format."
+                        yield "I need at least one time range to search for the logs. Please provide a timestamp in YYYYMMDDHHMM format."
+                        return
                     
                     # Parse and validate time ranges
                     try:
                         parsed_time_ranges = [self._parse_date(time_range) for time_range in args["time_ranges"]]
                         args["time_ranges"] = parsed_time_ranges
                     except ValueError as e:
-                        return str(e)
+                        yield str(e)
+                        return
                     
                     # Search logs
                     try:
-                        search_results = self.search_logs(
+                        search_results = await self.search_logs(
                             args["search_id"],
                             args["time_ranges"]
                         )
-                        logger.info(f"Search results: {json.dumps(search_results, indent=2)}")
+                        # Dumping every match is only worth it when debugging
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Search results: {orjson.dumps(search_results, default=str).decode()}")
                         
                         # Store search results for follow-up questions
                         self.last_search_results = search_results
@@ -399,45 +463,66 @@ class LogSearchClient:
                         elif not isinstance(search_results, dict):
                             search_results = {"results": str(search_results)}
                         
+                        # Nothing for the model to summarize; answer from a template
+                        # instead of paying for a second completion
+                        if search_results.get("error") or not search_results.get("results"):
+                            if search_results.get("error"):
+                                answer = f"I couldn't search the logs: {search_results['error']}"
+                            else:
+                                answer = f"No matches found for ID {args['search_id']} in the given time range."
+                            self.conversation_history.append({"role": "assistant", "content": answer})
+                            yield answer
+                            return
+                        
                         # Prepare messages for the second OpenAI call
                         messages = [
-                            {"role": "system", "content": system_message},
+                            {"role": "system", "content": SYSTEM_MESSAGE},
                             *self.conversation_history[-5:],
                             {"role": "assistant", "content": message.content, "tool_calls": [tool_call]},
-                            {"role": "tool", "content": json.dumps(search_results), "tool_call_id": tool_call.id}
+                            {"role": "tool", "content": orjson.dumps(search_results, default=str).decode(), "tool_call_id": tool_call.id}
                         ]
                         
-                        # Send results back to the model
-                        response = self.client.chat.completions.create(
+                        # Send results back to the model and stream the answer; only
+                        # this call is streamed, since the first one has to be read
+                        # whole to see whether the model asked for a tool
+                        response = await self.client.chat.completions.create(
                             model=model,
-                            messages=messages
+                            messages=messages,
+                            stream=True
                         )
-                        answer = response.choices[0].message.content
+                        parts = []
+                        async for chunk in response:
+                            content = chunk.choices[0].delta.content if chunk.choices else None
+                            if content:
+                                parts.append(content)
+                                yield content
+                        answer = "".join(parts)
                         
                         # Add assistant's response to conversation history
                         self.conversation_history.append({"role": "assistant", "content": answer})
                         
-                        return answer
+                        return
                     except Exception as e:
                         logger.error(f"Failed to process search results: {str(e)}")
-                        return f"I found the logs but encountered an error while processing them: {str(e)}"
+                        yield f"I found the logs but encountered an error while processing them: {str(e)}"
+                        return
             
             answer = message.content if message.content else "I couldn't process your request. Please try again."
             
             # Add assistant's response to conversation history
             self.conversation_history.append({"role": "assistant", "content": answer})
             
-            return answer
+            yield answer
             
         except Exception as e:
             logger.error(f"Failed to chat with logs: {str(e)}")
-            return f"An error occurred while processing your request: {str(e)}"
+            yield f"An error occurred while processing your request: {str(e)}"
 
-def main():
+async def _repl():
+    """Run the interactive chat loop."""
+    client = LogSearchClient()
     try:
-        logger.info("Starting Log Search Assistant...")
-        # Example usage
-        client = LogSearchClient()
+        await client.connect()
         
         print("\nWelcome to Log Search Assistant!")
         print("You can ask questions about logs in natural language.")
@@ -447,23 +532,41 @@ def main():
         print("- Find logs for ID 12345 in February 2025")
         print("Type 'quit' to exit\n")
         
+        # Prompt on the event loop itself, so streaming answers and other
+        # background tasks keep running while the user types
+        session = PromptSession()
         while True:
             try:
-                query = input("\nAsk a question about the logs (or 'quit' to exit): ")
+                with patch_stdout():
+                    query = await session.prompt_async("\nAsk a question about the logs (or 'quit' to exit): ")
+            except (EOFError, KeyboardInterrupt):
+                # Ctrl-D / Ctrl-C at the prompt
+                break
+            
+            try:
                 if query.lower() == 'quit':
                     break
                 
-                response = client.chat_with_logs(query)
-                print(f"\nAssistant: {response}")
+                # Print the answer as it streams in
+                print("\nAssistant: ", end="", flush=True)
+                async for part in client.chat_with_logs_stream(query):
+                    print(part, end="", flush=True)
+                print()
                 
             except Exception as e:
                 print(f"Error: {str(e)}")
                 logger.error(f"Error in main loop: {str(e)}")
-                
+    finally:
+        await client.aclose()
+
+def main():
+    try:
+        logger.info("Starting Log Search Assistant...")
+        asyncio.run(_repl())
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
         print(f"Fatal error: {str(e)}")
         print("Please check the logs for more details.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,23 +1,22 @@
+import asyncio
+import functools
 import os
-import sys
-import json
+import logging
+import hashlib
 import re
-from pathlib import Path
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+from cachetools import TTLCache
+import orjson
+from dateparser.search import search_dates
 
-# Add the project root to Python path
-project_root = str(Path(__file__).parent.parent.parent)
-sys.path.append(project_root)
-
-from slack_bolt import App
-from slack_bolt.adapter.socket_mode import SocketModeHandler
+import httpx
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 from dotenv import load_dotenv
-from app.logsearch.s3_operations import S3Operations
-from app.logsearch.log_search import search_logs
-from openai import OpenAI
+from openai import AsyncOpenAI
 from app.mcp.mcp_client import LogSearchClient
 from app.utils.logging_config import setup_logging
+from app.ai.semantic_cache import SemanticCache
 
 # Setup logging
 loggers = setup_logging()
@@ -30,57 +29,140 @@ logger.info("Environment variables loaded successfully")
 
 # Initialize the Slack app
 logger.info("Initializing Slack app...")
-app = App(token=os.environ.get("SLACK_BOT_TOKEN"))
+app = AsyncApp(token=os.environ.get("SLACK_BOT_TOKEN"))
 logger.info("Slack app initialized successfully")
 
-# Initialize S3 operations
-logger.info("Initializing S3 operations...")
-s3_ops = S3Operations(
-    aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY")
-)
-logger.info("S3 operations initialized successfully")
+@functools.cache
+def get_http_client():
+    """Create the shared HTTP/2 connection pool on first use."""
+    # One pool for all outbound async HTTP, so the parse and summary calls
+    # reuse a warm TLS connection instead of each paying for a handshake
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=90),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
 
-# Initialize OpenAI client
-logger.info("Initializing OpenAI client...")
-openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-logger.info("OpenAI client initialized successfully")
+@functools.cache
+def get_openai():
+    """Create the OpenAI client on first use."""
+    logger.info("Initializing OpenAI client...")
+    return AsyncOpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        http_client=get_http_client(),
+        # The SDK would otherwise inherit the pool's 30s timeout, too short for
+        # a non-streaming gpt-4 answer; keep its usual 600s with a fast connect
+        timeout=httpx.Timeout(600.0, connect=5.0)
+    )
 
-# Initialize MCP client
-logger.info("Initializing MCP client...")
-mcp_client = LogSearchClient(openai_api_key=os.environ.get("OPENAI_API_KEY"))
-logger.info("MCP client initialized successfully")
+@functools.cache
+def get_mcp_client():
+    """Create the MCP client on first use."""
+    logger.info("Initializing MCP client...")
+    return LogSearchClient(openai_api_key=os.environ.get("OPENAI_API_KEY"), http_client=get_http_client())
 
 # Initialize cache for search results
-search_cache = defaultdict(dict)
-CACHE_EXPIRY = timedelta(hours=1)  # Cache results for 1 hour
+search_cache = TTLCache(maxsize=1024, ttl=3600)  # Cache results for 1 hour
 
 # Track the last search for each user
-user_last_search = {}
+user_last_search = TTLCache(maxsize=4096, ttl=24 * 3600)
+
+# Completions of identical requests are reused, keyed by a SHA-256 of the request
+llm_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Answers to follow-up questions, matched by wording similarity per user and search
+followup_cache = SemanticCache(threshold=0.85)
+
+# Phrases that mark a command as a follow-up to an earlier search
+COMMAND_FOLLOWUP_PHRASES = [
+    "what about", "tell me more", "explain", "how about",
+    "what else", "and", "also", "more", "further",
+    "additionally", "what happened", "show me", "find",
+    "search", "look up", "check"
+]
+
+# Phrases that mark a channel message as a follow-up question
+FOLLOWUP_PHRASES = COMMAND_FOLLOWUP_PHRASES + [
+    "can you", "could you",
+    "please", "help me", "i need", "i want to know",
+    "why", "how", "when", "where", "who", "what",
+    "show", "details", "error", "issue", "problem",
+    "failed", "failure", "exception", "stack trace"
+]
+
+def _needles(phrases):
+    """Drop phrases that contain another phrase; containment of the shorter one already decides."""
+    return tuple(p for p in phrases if not any(q != p and q in p for q in phrases))
+
+# Plain substring checks; an re alternation is tried alternative by
+# alternative at every position and measured slower than this
+_FOLLOWUP_NEEDLES = _needles(FOLLOWUP_PHRASES)
+_COMMAND_FOLLOWUP_NEEDLES = _needles(COMMAND_FOLLOWUP_PHRASES)
+
+# Search IDs in free text: any number, and the 12+ digit IDs used by our services
+_RE_DIGITS = re.compile(r'\b\d+\b')
+_RE_LONG_ID = re.compile(r'\b\d{12,}\b')
+
+FOLLOWUP_SYSTEM_PROMPT = """You are a helpful assistant analyzing log data. Provide clear, detailed answers based on the available log information, especially when discussing errors or issues.
+Focus specifically on what was asked in the question. If the question is about errors or issues, provide detailed information about:
+1. The exact error message
+2. When and where it occurred
+3. Any relevant context or sequence of events
+4. Any error handling or recovery attempts"""
+
+# Tool the parse request must call, so the parsed fields come back as JSON
+SEARCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "run_log_search",
+        "description": "Search logs for an ID at a given time.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "search_id": {
+                    "type": "string",
+                    "description": "The ID to search for in logs"
+                },
+                "time_range": {
+                    "type": "string",
+                    "description": "Time to search in format YYYYMMDDHHMM"
+                }
+            },
+            "required": ["search_id", "time_range"]
+        }
+    }
+}
+
+def _llm_key(**request):
+    """Build a deterministic cache key for a chat completion request."""
+    return hashlib.sha256(orjson.dumps(request, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+async def cached_chat(**request):
+    """Create a chat completion, reusing the message of an identical earlier request."""
+    key = _llm_key(**request)
+    message = llm_cache.get(key)
+    if message is not None:
+        logger.info("Using cached OpenAI response")
+        return message
+    
+    response = await get_openai().chat.completions.create(**request)
+    message = response.choices[0].message
+    llm_cache[key] = message
+    return message
 
 def is_followup_question(text):
     """Check if the message is likely a follow-up question."""
-    followup_phrases = [
-        "what about", "tell me more", "explain", "how about",
-        "what else", "and", "also", "more", "further",
-        "additionally", "what happened", "show me", "find",
-        "search", "look up", "check", "can you", "could you",
-        "please", "help me", "i need", "i want to know",
-        "why", "how", "when", "where", "who", "what",
-        "show", "details", "error", "issue", "problem",
-        "failed", "failure", "exception", "stack trace"
-    ]
     text_lower = text.lower()
-    return any(phrase in text_lower for phrase in followup_phrases) or text_lower.endswith('?')
+    return text_lower.endswith('?') or any(phrase in text_lower for phrase in _FOLLOWUP_NEEDLES)
 
 def extract_search_id(text):
     """Extract a search ID from the text if present."""
     # Look for a 12+ digit number
-    match = re.search(r'\b\d{12,}\b', text)
+    match = _RE_LONG_ID.search(text)
     return match.group(0) if match else None
 
 @app.event("message")
-def handle_message_events(body, say):
+async def handle_message_events(body, say):
     """Handle regular message events for follow-up questions."""
     logger.info(f"Received message event: {body}")
     
@@ -105,7 +187,7 @@ def handle_message_events(body, say):
     last_search = user_last_search.get(user_id)
     if not last_search:
         logger.info(f"No previous search found for user {user_id}")
-        say("I don't have any previous search to follow up on. Please use `/loki` or `/lokilens` to start a new search.")
+        await say("I don't have any previous search to follow up on. Please use `/loki` or `/lokilens` to start a new search.")
         return
         
     try:
@@ -119,68 +201,85 @@ def handle_message_events(body, say):
         cached_data = get_cached_results(search_id, time_range)
         if cached_data:
             logger.info("Using cached results for follow-up question")
-            # Create a prompt for the follow-up question
-            prompt = f"""
-            Based on the previous search results for ID {search_id}, please answer this follow-up question:
-            {text}
             
-            Focus specifically on what was asked in the question. If the question is about errors or issues, provide detailed information about:
-            1. The exact error message
-            2. When and where it occurred
-            3. Any relevant context or sequence of events
-            4. Any error handling or recovery attempts
+            # Reuse the answer to an equivalent question about the same search
+            session_id = f"{user_id}:{search_id}_{time_range}"
+            answer, similarity = followup_cache.get(text, session_id)
+            if answer is not None:
+                logger.info(f"Answering follow-up from semantic cache (similarity {similarity:.2f})")
+                await say(answer)
+                return
             
-            Here are the logs to analyze:
-            {json.dumps(cached_data['results'], indent=2)}
+            # Static instructions and the logs come first and the question last,
+            # so repeat follow-ups on the same search share a cacheable prompt prefix
+            prompt = f"""
+            Here are the logs from the previous search for ID {search_id}:
+            {cached_data['formatted_text']}
+            
+            Please answer this follow-up question about them:
+            {text}
             """
             
             # Call OpenAI API for the follow-up response
-            response = openai_client.chat.completions.create(
+            message = await cached_chat(
                 model="gpt-4",
                 messages=[
-                    {"role": "system", "content": "You are a helpful assistant analyzing log data. Provide clear, detailed answers based on the available log information, especially when discussing errors or issues."},
+                    {"role": "system", "content": FOLLOWUP_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=1000
             )
             
-            say(response.choices[0].message.content)
+            followup_cache.set(text, message.content, session_id)
+            await say(message.content)
         else:
             logger.info("No cached results found for follow-up question")
-            say("I'm sorry, but I can't find the previous search results. Please start a new search using `/loki` or `/lokilens`.")
+            await say("I'm sorry, but I can't find the previous search results. Please start a new search using `/loki` or `/lokilens`.")
             
     except Exception as e:
         logger.error(f"Error processing follow-up question: {str(e)}", exc_info=True)
-        say(f"Error processing your question: {str(e)}")
+        await say(f"Error processing your question: {str(e)}")
 
 def cache_search_results(search_id, time_range, results):
-    """Cache search results with timestamp."""
+    """Cache search results with timestamp and return the cached entry."""
     cache_key = f"{search_id}_{time_range}"
-    search_cache[cache_key] = {
+    cached_data = search_cache[cache_key] = {
         'results': results,
+        # Formatted once here and reused for the summary and every follow-up question
+        'formatted_text': _format_results(results),
         'timestamp': datetime.now(),
         'summary': None  # Will store the AI summary
     }
     logger.info(f"Cached search results for {cache_key}")
+    return cached_data
 
 def get_cached_results(search_id, time_range):
     """Get cached results if they exist and haven't expired."""
     cache_key = f"{search_id}_{time_range}"
+    # Expired entries are never returned by the TTLCache
     cached_data = search_cache.get(cache_key)
     
     if cached_data:
-        # Check if cache has expired
-        if datetime.now() - cached_data['timestamp'] < CACHE_EXPIRY:
-            logger.info(f"Retrieved cached results for {cache_key}")
-            return cached_data
-        else:
-            # Remove expired cache entry
-            del search_cache[cache_key]
-            logger.info(f"Cache expired for {cache_key}")
+        logger.info(f"Retrieved cached results for {cache_key}")
     
-    return None
+    return cached_data
 
-def generate_response(search_id, results, time_range, is_followup=False):
+def _format_results(results):
+    """Render search results grouped by container as plain text for a prompt."""
+    parts = []
+    append = parts.append
+    for container, logs in results.items():
+        append(f"Container: {container} ({len(logs)} matches)\n")
+        for log in logs:
+            # Handle both string and dictionary log entries; compact JSON keeps the prompt small
+            if isinstance(log, dict):
+                append(orjson.dumps(log, default=str).decode())
+            else:
+                append(str(log))
+            append("\n")
+    return "".join(parts)
+
+async def generate_response(search_id, results, time_range, is_followup=False, formatted_results=None):
     """Generate a lively response using OpenAI based on the search results."""
     logger.info(f"Generating response for search_id: {search_id} (followup: {is_followup})")
     
@@ -188,18 +287,10 @@ def generate_response(search_id, results, time_range, is_followup=False):
         logger.warning(f"No logs found for ID: {search_id}")
         return f"No logs found for ID: {search_id}. Would you like to try another search?"
     
-    # Format the results for the prompt
-    logger.debug("Formatting results for OpenAI prompt")
-    formatted_results = ""
-    for container, logs in results.items():
-        formatted_results += f"Container: {container} ({len(logs)} matches)\n"
-        for log in logs:
-            # Handle both string and dictionary log entries
-            if isinstance(log, dict):
-                log_str = json.dumps(log, indent=2)
-            else:
-                log_str = str(log)
-            formatted_results += f"{log_str}\n"
+    # Format the results for the prompt, unless the cache already did
+    if formatted_results is None:
+        logger.debug("Formatting results for OpenAI prompt")
+        formatted_results = _format_results(results)
     
     # Create a prompt for OpenAI
     prompt = f"""
@@ -216,13 +307,13 @@ def generate_response(search_id, results, time_range, is_followup=False):
     
     logger.debug("Sending request to OpenAI")
     # Call OpenAI API
-    response = openai_client.chat.completions.create(
+    message = await cached_chat(
         model="gpt-4",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=500
     )
     
-    summary = response.choices[0].message.content
+    summary = message.content
     
     # Cache the summary
     cache_key = f"{search_id}_{time_range}"
@@ -235,73 +326,86 @@ def generate_response(search_id, results, time_range, is_followup=False):
     
     return summary
 
-def parse_natural_language_input(text):
+def _find_time(text):
+    """Find the first date/time mentioned in free text, or None."""
+    # search_dates tolerates the surrounding words ("happened yesterday at 3pm")
+    # that make dateparser.parse give up on the whole string
+    found = search_dates(text, languages=['en'], settings={'PREFER_DATES_FROM': 'past'})
+    return found[0][1] if found else None
+
+def _local_search_id(text):
+    """Return the match of an unambiguous search ID in a command, or None."""
+    match = _RE_LONG_ID.search(text)
+    if match:
+        return match
+    # Short IDs only in the documented "<id> <time>" shape: a leading number
+    # that is the only standalone number, so "2 hours ago for 12345" or
+    # "on 2024-05-01 id 12345" are left to the model
+    numbers = list(_RE_DIGITS.finditer(text))
+    if len(numbers) == 1 and not text[:numbers[0].start()].strip():
+        return numbers[0]
+    return None
+
+async def parse_natural_language_input(text):
     """Use AI to parse natural language input into search_id and time_range."""
     logger.info(f"Parsing natural language input: {text}")
     
     # Check if this is a follow-up question
-    is_followup = any(phrase in text.lower() for phrase in [
-        "what about", "tell me more", "explain", "how about",
-        "what else", "and", "also", "more", "further",
-        "additionally", "what happened", "show me", "find",
-        "search", "look up", "check"
-    ])
+    text_lower = text.lower()
+    is_followup = any(phrase in text_lower for phrase in _COMMAND_FOLLOWUP_NEEDLES)
     
-    prompt = f"""
-    Parse the following text into a search ID and a time range.
+    # Commands like "12345 yesterday at 3pm" are parsed locally; only fall
+    # back to OpenAI when the ID or the time can't be recovered
+    id_match = _local_search_id(text)
+    if id_match:
+        time_text = (text[:id_match.start()] + text[id_match.end():]).strip()
+        # dateparser is blocking (and slow on first use); keep it off the event loop
+        parsed_time = await asyncio.to_thread(_find_time, time_text) if time_text else None
+        if parsed_time:
+            search_id = id_match.group(0)
+            time_range = parsed_time.strftime('%Y%m%d%H%M')
+            logger.info(f"Parsed input locally - search_id: {search_id}, time_range: {time_range}")
+            return search_id, time_range, is_followup
+    
+    messages = [
+        {"role": "system", "content": f"""
+    You are a helpful assistant analyzing log data. Parse the user's request into a search ID and a time range,
+    then call run_log_search with them.
     The time range should be in the format YYYYMMDDHHMM (e.g., 202205130933 for May 13, 2022 at 09:33).
+    The current time is {datetime.now().strftime('%Y%m%d%H%M')}.
     If the time is not specified, use the current time.
     If the date is not specified, use today's date.
-    
-    Text: {text}
-    
-    Return ONLY the search ID and time range in this exact format:
-    search_id: <id>
-    time_range: <YYYYMMDDHHMM>
-    
-    Do not include any other text or explanation.
-    """
+    """},
+        {"role": "user", "content": text}
+    ]
     
     try:
         logger.debug("Sending request to OpenAI for parsing")
-        response = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100
+        # Filling two tool arguments doesn't need gpt-4; the small model is
+        # faster and the call only emits ~20 tokens
+        message = await cached_chat(
+            model="gpt-4o-mini",
+            messages=messages,
+            tools=[SEARCH_TOOL],
+            tool_choice="required",
+            max_tokens=40
         )
         
-        # Parse the response
-        result = response.choices[0].message.content.strip()
-        logger.debug(f"Received parsing response: {result}")
-        
-        # Try different parsing approaches
-        try:
-            # First try: exact format
-            lines = result.split('\n')
-            if len(lines) >= 2:
-                search_id = lines[0].split(': ')[1].strip()
-                time_range = lines[1].split(': ')[1].strip()
+        if message.tool_calls:
+            tool_call = message.tool_calls[0]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Received parsing response: {tool_call.function.arguments}")
+            try:
+                args = orjson.loads(tool_call.function.arguments)
+                search_id = str(args["search_id"]).strip()
+                time_range = str(args["time_range"]).strip()
                 logger.info(f"Successfully parsed input - search_id: {search_id}, time_range: {time_range}")
                 return search_id, time_range, is_followup
-        except Exception as e:
-            logger.warning(f"First parsing attempt failed: {str(e)}")
-            
-        try:
-            # Second try: look for patterns in the text
-            search_id_match = re.search(r'search_id:\s*(\S+)', result)
-            time_range_match = re.search(r'time_range:\s*([^\n]+)', result)
-            
-            if search_id_match and time_range_match:
-                search_id = search_id_match.group(1)
-                time_range = time_range_match.group(1)
-                logger.info(f"Successfully parsed input using regex - search_id: {search_id}, time_range: {time_range}")
-                return search_id, time_range, is_followup
-        except Exception as e:
-            logger.warning(f"Second parsing attempt failed: {str(e)}")
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Could not read parsed arguments: {str(e)}")
             
-        # If all parsing attempts fail, try to extract just the ID and use current time
-        import re
-        id_match = re.search(r'\b\d+\b', text)
+        # If the tool call is unusable, try to extract just the ID and use current time
+        id_match = _RE_DIGITS.search(text)
         if id_match:
             search_id = id_match.group(0)
             time_range = datetime.now().strftime('%Y%m%d%H%M')
@@ -314,28 +418,39 @@ def parse_natural_language_input(text):
         logger.error(f"Error parsing natural language input: {str(e)}")
         raise ValueError(f"Could not understand the input. Please try again with a clearer format. Example: '12345 happened yesterday at 3pm'")
 
-@app.command("/loki")
-def handle_loki_command(ack, body, say):
-    """Handle the /loki command in Slack"""
-    logger.info(f"Received /loki command: {body}")
+async def handle_search_command(ack, body, say):
+    """Handle the /loki and /lokilens commands in Slack"""
+    command = body.get('command', '/loki')
+    logger.info(f"Received {command} command: {body}")
     
     # Get the command text from the user
     command_text = body.get('text', '').strip()
     user_id = body.get('user_id')
-    logger.debug(f"Command text: {command_text}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Command text: {command_text}")
     
     if not command_text:
         logger.warning("Empty command text received")
-        ack("Please provide a search ID and time information. Example: `/loki 12345 happened yesterday at 3pm`")
+        await ack(f"Please provide a search ID and time information. Example: `{command} 12345 happened yesterday at 3pm`")
         return
     
+    speculative_search = None
     try:
         # Acknowledge the command with the original text
-        ack(f"Searching logs for: {command_text}")
+        await ack(f"Searching logs for: {command_text}")
+        
+        # If the text already contains a full ID, start searching the current
+        # minute while the model parses; the result is used if the parse agrees
+        speculative_id = extract_search_id(command_text)
+        speculative_range = datetime.now().strftime('%Y%m%d%H%M')
+        if speculative_id:
+            speculative_search = asyncio.create_task(
+                get_mcp_client().search_logs(speculative_id, [speculative_range])
+            )
         
         # Parse the natural language input using AI
         logger.info("Starting natural language parsing")
-        search_id, time_range, is_followup = parse_natural_language_input(command_text)
+        search_id, time_range, is_followup = await parse_natural_language_input(command_text)
         logger.info(f"Parsed input - search_id: {search_id}, time_range: {time_range}, is_followup: {is_followup}")
         
         # Store the search parameters for this user
@@ -350,19 +465,30 @@ def handle_loki_command(ack, body, say):
             cached_data = get_cached_results(search_id, time_range)
             if cached_data:
                 logger.info("Using cached results for follow-up question")
-                response = generate_response(search_id, cached_data['results'], time_range, is_followup=True)
-                say(response)
+                response = await generate_response(
+                    search_id, cached_data['results'], time_range, is_followup=True,
+                    formatted_results=cached_data['formatted_text']
+                )
+                await say(response)
                 return
         
         # Search for logs using MCP client
         logger.info("Searching logs using MCP client")
-        results = mcp_client.search_logs(search_id, [time_range])
-        logger.debug(f"MCP client response: {results}")
+        if speculative_search and (search_id, time_range) == (speculative_id, speculative_range):
+            logger.info("Using speculative search results")
+            results = await speculative_search
+        else:
+            if speculative_search:
+                # The parse disagreed; don't let the guess compete for the pool
+                speculative_search.cancel()
+            results = await get_mcp_client().search_logs(search_id, [time_range])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"MCP client response: {results}")
         
         # Check if there was an error
         if "error" in results:
             logger.error(f"MCP client error: {results['error']}")
-            say(f"Error searching logs: {results['error']}")
+            await say(f"Error searching logs: {results['error']}")
             return
             
         # Get the actual results
@@ -370,92 +496,44 @@ def handle_loki_command(ack, body, say):
         logger.info(f"Found {len(log_results)} containers with logs")
         
         # Cache the results
-        cache_search_results(search_id, time_range, log_results)
+        cached_data = cache_search_results(search_id, time_range, log_results)
         
         # Generate a lively response using OpenAI
         logger.info("Generating response")
-        response = generate_response(search_id, log_results, time_range)
+        response = await generate_response(
+            search_id, log_results, time_range,
+            formatted_results=cached_data['formatted_text']
+        )
         logger.info("Sending response to Slack")
-        say(response)
+        await say(response)
             
     except Exception as e:
         logger.error(f"Error processing command: {str(e)}", exc_info=True)
-        say(f"Error processing command: {str(e)}")
+        await say(f"Error processing command: {str(e)}")
+    finally:
+        # Drop a speculative search whose result was not needed
+        if speculative_search and not speculative_search.done():
+            speculative_search.cancel()
 
-@app.command("/lokilens")
-def handle_lokilens_command(ack, body, say):
-    """Handle the /lokilens command in Slack"""
-    logger.info(f"Received /lokilens command: {body}")
-    
-    # Get the command text from the user
-    command_text = body.get('text', '').strip()
-    user_id = body.get('user_id')
-    logger.debug(f"Command text: {command_text}")
-    
-    if not command_text:
-        logger.warning("Empty command text received")
-        ack("Please provide a search ID and time information. Example: `/lokilens 12345 happened yesterday at 3pm`")
-        return
-    
+# Both commands share one handler
+for command_name in ("/loki", "/lokilens"):
+    app.command(command_name)(handle_search_command)
+
+async def _run_socket_mode():
+    """Connect the app over Socket Mode and serve events until stopped"""
+    handler = AsyncSocketModeHandler(app, os.environ.get("SLACK_APP_TOKEN"))
     try:
-        # Acknowledge the command with the original text
-        ack(f"Searching logs for: {command_text}")
-        
-        # Parse the natural language input using AI
-        logger.info("Starting natural language parsing")
-        search_id, time_range, is_followup = parse_natural_language_input(command_text)
-        logger.info(f"Parsed input - search_id: {search_id}, time_range: {time_range}, is_followup: {is_followup}")
-        
-        # Store the search parameters for this user
-        user_last_search[user_id] = {
-            'search_id': search_id,
-            'time_range': time_range,
-            'timestamp': datetime.now()
-        }
-        
-        # Check cache for follow-up questions
-        if is_followup:
-            cached_data = get_cached_results(search_id, time_range)
-            if cached_data:
-                logger.info("Using cached results for follow-up question")
-                response = generate_response(search_id, cached_data['results'], time_range, is_followup=True)
-                say(response)
-                return
-        
-        # Search for logs using MCP client
-        logger.info("Searching logs using MCP client")
-        results = mcp_client.search_logs(search_id, [time_range])
-        logger.debug(f"MCP client response: {results}")
-        
-        # Check if there was an error
-        if "error" in results:
-            logger.error(f"MCP client error: {results['error']}")
-            say(f"Error searching logs: {results['error']}")
-            return
-            
-        # Get the actual results
-        log_results = results.get("results", {})
-        logger.info(f"Found {len(log_results)} containers with logs")
-        
-        # Cache the results
-        cache_search_results(search_id, time_range, log_results)
-        
-        # Generate a lively response using OpenAI
-        logger.info("Generating response")
-        response = generate_response(search_id, log_results, time_range)
-        logger.info("Sending response to Slack")
-        say(response)
-            
-    except Exception as e:
-        logger.error(f"Error processing command: {str(e)}", exc_info=True)
-        say(f"Error processing command: {str(e)}")
+        await handler.start_async()
+    finally:
+        # Close the shared pool on the loop that used it, if it was ever created
+        if get_http_client.cache_info().currsize:
+            await get_http_client().aclose()
 
 def start_slack_app():
     """Start the Slack app in Socket Mode"""
     logger.info("Starting Slack app in Socket Mode")
-    handler = SocketModeHandler(app, os.environ.get("SLACK_APP_TOKEN"))
-    handler.start()
-    logger.info("Slack app started successfully")
+    asyncio.run(_run_socket_mode())
+    logger.info("Slack app stopped")
 
 if __name__ == "__main__":
     logger.info("Starting application...")
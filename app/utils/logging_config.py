@@ -1,28 +1,46 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 import os
 
+# Background listener that writes queued records, started once per process
+_listener = None
+
 def setup_logging():
     """Configure logging for the entire application"""
+    global _listener
     # Create logs directory if it doesn't exist
     log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-    # Generate log filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"lokilens_{timestamp}.log")
+    # Configure root logger once; callers only enqueue records, and the
+    # listener thread does the formatting and file/console I/O
+    if _listener is None:
+        # Generate log filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_file = os.path.join(log_dir, f"lokilens_{timestamp}.log")
+
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
+        )
+        file_handler = logging.FileHandler(log_file)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
 
-    # Configure root logger
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        # Only merge args into the message; the listener's handlers apply the real format
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        logging.basicConfig(handlers=[queue_handler])
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+        _listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(_listener.stop)
 
     # Create loggers for different components
     loggers = {
@@ -33,8 +51,16 @@ def setup_logging():
         'openai': logging.getLogger('openai')
     }
 
-    # Set all loggers to DEBUG level
+    # The root and component loggers all follow LOG_LEVEL, INFO by default;
+    # production can raise it so the isEnabledFor guards around hot-path
+    # logging skip the formatting. Applied on every call so a LOG_LEVEL
+    # loaded from .env after the first call still takes effect.
+    level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    logging.getLogger().setLevel(level)
     for logger in loggers.values():
-        logger.setLevel(logging.DEBUG)
+        logger.setLevel(level)
+
+    # Exposed so callers can stop the listener on shutdown
+    loggers['listener'] = _listener
 
     return loggers 
\ No newline at end of file
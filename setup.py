@@ -12,7 +12,11 @@ setup(
         "openai>=1.12.0",
         "python-multipart>=0.0.9",
         "pydantic>=2.6.1",
-        "sseclient-py>=1.8.0",
+        "isal>=1.6.0",
+        "httpx>=0.27.0",
+        "cachetools>=5.3.0",
+        "orjson>=3.9.0",
+        "prompt_toolkit>=3.0.0",
     ],
     python_requires=">=3.11",
 ) 
\ No newline at end of file
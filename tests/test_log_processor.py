@@ -0,0 +1,118 @@
+import gzip
+import io
+import random
+import re
+import threading
+import unittest
+from collections import defaultdict
+from unittest import mock
+
+from app.logsearch import log_processor
+from app.logsearch.log_processor import LogProcessor, extract_container_name
+
+
+def baseline_process(file_content, search_term):
+    """The original TextIOWrapper line loop that process_gzipped_stream replaced."""
+    grouped_logs = defaultdict(list)
+    with gzip.GzipFile(fileobj=io.BytesIO(file_content), mode="rb") as gz_file:
+        with io.TextIOWrapper(gz_file, encoding="utf-8", errors="replace") as text_file:
+            for line in text_file:
+                if search_term in line:
+                    match = re.search(r'"container_name":"([^"]+)"', line)
+                    container_name = match.group(1) if match else "Unknown"
+                    grouped_logs[container_name].append(line.strip())
+    return grouped_logs
+
+
+def random_log(rng, lines, max_line=200):
+    """Build newline-separated JSON-ish log lines, some tagged with the search ID."""
+    words = ["GET", "POST", "error", "ok", "req-12345", "12345", "héllo", "日志", "timeout"]
+    out = []
+    for _ in range(lines):
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(0, max_line // 8)))
+        if rng.random() < 0.7:
+            body = f'{{"container_name":"svc-{rng.randint(0, 3)}","msg":"{body}"}}'
+        out.append(body)
+    return "\n".join(out).encode("utf-8")
+
+
+class ProcessGzippedStreamTests(unittest.TestCase):
+    def setUp(self):
+        # Each test gets a fresh per-thread buffer so sizes set here apply
+        patcher = mock.patch.object(log_processor, "_scratch", threading.local())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertMatchesBaseline(self, raw, search_term):
+        content = gzip.compress(raw)
+        expected = baseline_process(content, search_term)
+        actual = LogProcessor.process_gzipped_logs(content, search_term)
+        self.assertEqual(dict(actual), dict(expected))
+
+    def test_fuzz_against_baseline(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            raw = random_log(rng, rng.randint(0, 50))
+            if rng.random() < 0.5:
+                raw += b"\n"
+            self.assertMatchesBaseline(raw, rng.choice(["12345", "error", "héllo", "svc-1", "missing"]))
+
+    def test_fuzz_with_small_buffers(self):
+        # Lines routinely straddle reads and outgrow the scratch buffer
+        rng = random.Random(1)
+        for _ in range(100):
+            with mock.patch.object(log_processor, "_scratch", threading.local()), \
+                    mock.patch.object(log_processor, "READ_BUFFER_SIZE", rng.choice([1, 7, 64])), \
+                    mock.patch.object(log_processor, "SCRATCH_BUFFER_SIZE", rng.choice([1, 16, 128])):
+                self.assertMatchesBaseline(random_log(rng, rng.randint(1, 30)), "12345")
+
+    def test_buffer_grows_for_long_lines(self):
+        long_line = b'{"container_name":"big","msg":"' + b"x" * 5000 + b' 12345"}'
+        raw = b"before 12345\n" + long_line + b"\nafter\n"
+        with mock.patch.object(log_processor, "READ_BUFFER_SIZE", 64), \
+                mock.patch.object(log_processor, "SCRATCH_BUFFER_SIZE", 128):
+            result = LogProcessor.process_gzipped_logs(gzip.compress(raw), "12345")
+            self.assertGreaterEqual(len(log_processor._scratch_buffer()), len(long_line))
+        self.assertEqual(result["big"], [long_line.decode()])
+        self.assertEqual(result["Unknown"], ["before 12345"])
+
+    def test_buffer_is_reused_within_a_thread(self):
+        LogProcessor.process_gzipped_logs(gzip.compress(b"12345\n"), "12345")
+        buffer = log_processor._scratch_buffer()
+        LogProcessor.process_gzipped_logs(gzip.compress(b"12345\n"), "12345")
+        self.assertIs(log_processor._scratch_buffer(), buffer)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(log_processor._scratch_buffer()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], buffer)
+
+    def test_last_line_without_newline(self):
+        raw = b'first\n{"container_name":"api","msg":"12345 done"}'
+        result = LogProcessor.process_gzipped_logs(gzip.compress(raw), "12345")
+        self.assertEqual(dict(result), {"api": ['{"container_name":"api","msg":"12345 done"}']})
+
+    def test_partial_tail_is_not_matched_twice(self):
+        raw = b"12345 a\n12345 b\n12345 c"
+        with mock.patch.object(log_processor, "READ_BUFFER_SIZE", 3), \
+                mock.patch.object(log_processor, "SCRATCH_BUFFER_SIZE", 4):
+            result = LogProcessor.process_gzipped_logs(gzip.compress(raw), "12345")
+        self.assertEqual(result["Unknown"], ["12345 a", "12345 b", "12345 c"])
+
+    def test_invalid_gzip_returns_nothing(self):
+        self.assertEqual(dict(LogProcessor.process_gzipped_logs(b"not gzip", "12345")), {})
+
+
+class ExtractContainerNameTests(unittest.TestCase):
+    def test_extracts_name(self):
+        self.assertEqual(extract_container_name(b'{"container_name":"api","x":1}'), b"api")
+
+    def test_missing_or_empty_name(self):
+        self.assertEqual(extract_container_name(b'{"pod":"api"}'), b"Unknown")
+        self.assertEqual(extract_container_name(b'{"container_name":""}'), b"Unknown")
+        self.assertEqual(extract_container_name(b'{"container_name":"api'), b"Unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
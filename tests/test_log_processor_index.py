@@ -0,0 +1,107 @@
+import gzip
+import io
+import random
+import unittest
+
+from app.logsearch import log_processor_index
+from app.logsearch.log_processor_index import (
+    LogIndex, _contains_trigram, index_key, search_trigrams, shard_trigrams
+)
+
+
+class FakeS3:
+    """In-memory stand-in for the parts of S3Operations the index uses."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+        self.reads = 0
+
+    def list_files_for_date(self, bucket, date_prefix):
+        return sorted(key for key in self.objects if key.startswith(date_prefix))
+
+    def open_object_stream(self, bucket, key):
+        return io.BytesIO(self.objects[key])
+
+    def put_file_content(self, bucket, key, content):
+        self.objects[key] = content
+
+    def find_file_content(self, bucket, key):
+        self.reads += 1
+        return self.objects.get(key)
+
+
+class TrigramTests(unittest.TestCase):
+    def test_search_trigrams(self):
+        self.assertEqual(search_trigrams("abcab"), [b"abc", b"bca", b"cab"])
+        self.assertEqual(search_trigrams("ab"), [])
+
+    def test_round_trip_matches_substrings(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            raw = bytes(rng.choice(b"abcdef\n\xc3\xa9") for _ in range(rng.randint(0, 3000)))
+            blob = shard_trigrams(io.BytesIO(gzip.compress(raw)))
+            self.assertEqual(len(blob) % 3, 0)
+            for _ in range(20):
+                trigram = bytes(rng.choice(b"abcdef\n\xc3\xa9") for _ in range(3))
+                self.assertEqual(_contains_trigram(blob, trigram), trigram in raw)
+
+    def test_trigrams_spanning_reads_are_kept(self):
+        raw = b"x" * 10 + b"abc" + b"y" * 10
+        original = log_processor_index.INDEX_CHUNK_SIZE
+        log_processor_index.INDEX_CHUNK_SIZE = 11
+        try:
+            blob = shard_trigrams(io.BytesIO(gzip.compress(raw)))
+        finally:
+            log_processor_index.INDEX_CHUNK_SIZE = original
+        for trigram in (b"xab", b"abc", b"bcy"):
+            self.assertTrue(_contains_trigram(blob, trigram))
+
+
+class CandidateFilesTests(unittest.TestCase):
+    def setUp(self):
+        log_processor_index._index_cache.clear()
+        self.addCleanup(log_processor_index._index_cache.clear)
+        self.s3 = FakeS3({
+            "202405011200/a.gz": gzip.compress(b"request 12345 failed\n"),
+            "202405011200/b.gz": gzip.compress(b"request 67890 ok\n"),
+        })
+        self.index = LogIndex(self.s3)
+
+    def test_filters_files_without_the_term(self):
+        self.assertEqual(self.index.build("bucket", "202405011200"), 2)
+        self.assertIn(index_key("202405011200"), self.s3.objects)
+        files = ["202405011200/a.gz", "202405011200/b.gz"]
+        self.assertEqual(
+            self.index.candidate_files("bucket", "202405011200", files, "12345"),
+            ["202405011200/a.gz"]
+        )
+        self.assertEqual(self.index.candidate_files("bucket", "202405011200", files, "request"), files)
+
+    def test_keeps_files_missing_from_the_index(self):
+        self.index.build("bucket", "202405011200")
+        files = ["202405011200/b.gz", "202405011200/new.gz"]
+        self.assertEqual(
+            self.index.candidate_files("bucket", "202405011200", files, "12345"),
+            ["202405011200/new.gz"]
+        )
+
+    def test_keeps_everything_without_index_or_short_term(self):
+        files = ["202405011200/a.gz", "202405011200/b.gz"]
+        self.assertEqual(self.index.candidate_files("bucket", "202405011200", files, "12345"), files)
+        self.index.build("bucket", "202405011200")
+        self.assertEqual(self.index.candidate_files("bucket", "202405011200", files, "12"), files)
+
+    def test_missing_index_is_cached(self):
+        self.assertIsNone(self.index.load("bucket", "202405011200"))
+        self.assertIsNone(self.index.load("bucket", "202405011200"))
+        self.assertEqual(self.s3.reads, 1)
+
+    def test_build_replaces_cached_index(self):
+        self.assertIsNone(self.index.load("bucket", "202405011200"))
+        self.index.build("bucket", "202405011200")
+        self.assertEqual(set(self.index.load("bucket", "202405011200")),
+                         {"202405011200/a.gz", "202405011200/b.gz"})
+
+
+if __name__ == "__main__":
+    unittest.main()
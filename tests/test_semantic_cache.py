@@ -0,0 +1,64 @@
+import unittest
+
+from app.ai.semantic_cache import SemanticCache, _terms
+
+
+class TermsTests(unittest.TestCase):
+    def test_drops_stop_words_and_folds_plurals(self):
+        self.assertEqual(_terms("Show me the errors in this container"), {"error", "container"})
+
+    def test_keeps_short_and_double_s_words(self):
+        self.assertEqual(_terms("bus class was"), {"bus", "class"})
+
+    def test_only_stop_words(self):
+        self.assertEqual(_terms("Can you tell me about this?"), frozenset())
+
+
+class SemanticCacheTests(unittest.TestCase):
+    def test_reworded_question_hits(self):
+        cache = SemanticCache()
+        cache.set("What errors are there?", "three errors", "s1")
+        response, similarity = cache.get("Show me the errors", "s1")
+        self.assertEqual(response, "three errors")
+        self.assertEqual(similarity, 1.0)
+
+    def test_below_threshold_misses(self):
+        cache = SemanticCache(threshold=0.85)
+        cache.set("errors in api container", "answer", "s1")
+        # 2 shared terms out of 4 distinct
+        response, similarity = cache.get("errors in api gateway", "s1")
+        self.assertIsNone(response)
+        self.assertEqual(similarity, 0.5)
+
+    def test_threshold_is_inclusive(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.set("errors in api container", "answer", "s1")
+        self.assertEqual(cache.get("errors in api gateway", "s1"), ("answer", 0.5))
+
+    def test_best_match_wins(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.set("api errors", "api answer", "s1")
+        cache.set("database timeouts", "db answer", "s1")
+        self.assertEqual(cache.get("database timeout", "s1"), ("db answer", 1.0))
+
+    def test_sessions_are_separate(self):
+        cache = SemanticCache()
+        cache.set("errors", "answer", "s1")
+        self.assertEqual(cache.get("errors", "s2"), (None, 0.0))
+
+    def test_stop_word_questions_never_match(self):
+        cache = SemanticCache()
+        cache.set("What is this?", "answer", "s1")
+        cache.set("errors", "answer", "s1")
+        self.assertEqual(cache.get("Can you tell me about that?", "s1"), (None, 0.0))
+
+    def test_keeps_latest_entries(self):
+        cache = SemanticCache(max_entries=2)
+        for word in ("alpha", "beta", "gamma"):
+            cache.set(word, word, "s1")
+        self.assertEqual(cache.get("alpha", "s1"), (None, 0.0))
+        self.assertEqual(cache.get("gamma", "s1"), ("gamma", 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()